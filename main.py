@@ -1,17 +1,264 @@
 import asyncio
+import copy
 import datetime
-import traceback
-from typing import Dict, List, Optional, Set
+import errno
+import random
+from string import Formatter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from astrbot.api.event import filter, AstrMessageEvent, MessageEventResult, MessageChain
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger, AstrBotConfig
 import astrbot.api.message_components as Comp
 
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - 取决于 AstrBot 运行环境
+    aiohttp = None
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - 取决于 AstrBot 运行环境
+    httpx = None
+
 # 发送失败时的最大重试次数
 MAX_RETRY = 3
-# 重试间隔基数（秒），实际间隔为 base * 2^(retry_count-1)
+# 重试间隔基数（秒），实际间隔为 base * 2^(retry_count-1) * (1 + 抖动)
 RETRY_BASE_DELAY = 1.0
+# 单次重试间隔上限（秒）
+RETRY_MAX_DELAY = 30.0
+# 随机抖动比例，避免大量目标同时失败时集中重试
+RETRY_JITTER = 0.5
+
+# 尚未记录 Bot 自身 ID 的平台使用的空集合，避免每条消息都新建 frozenset
+_EMPTY_IDS: FrozenSet[str] = frozenset()
+
+# 可重试的瞬态异常类型：会话关闭（RuntimeError）、超时、连接错误等
+TRANSIENT_EXCS: Tuple[type, ...] = (
+    RuntimeError,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+# 不可重试的异常类型，优先于 TRANSIENT_EXCS 判断（如 SSL/证书错误）
+PERMANENT_EXCS: Tuple[type, ...] = ()
+if aiohttp is not None:
+    TRANSIENT_EXCS += (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError)
+    # ClientConnectorSSLError 等同时继承自 ClientConnectorError，需单独排除
+    PERMANENT_EXCS += (aiohttp.ClientSSLError,)
+if httpx is not None:
+    TRANSIENT_EXCS += (httpx.NetworkError, httpx.TimeoutException)
+
+# 可重试的 OSError 错误码（资源暂时不可用）
+# 其余 OSError（如媒体文件不存在）不会因重试而恢复
+TRANSIENT_ERRNOS = frozenset({errno.EAGAIN, errno.EWOULDBLOCK})
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """判断发送异常是否为值得重试的瞬态错误"""
+    if isinstance(exc, PERMANENT_EXCS):
+        return False
+    if isinstance(exc, TRANSIENT_EXCS):
+        return True
+    return isinstance(exc, OSError) and exc.errno in TRANSIENT_ERRNOS
+
+
+# 预解析媒体消息段的类型标记
+# 图片：内容为 URL 或文件路径，转发时重新构建图片消息段
+MEDIA_IMAGE_URL = "image_url"
+# 文件、视频、语音：内容为原始消息段，转发时直接追加
+MEDIA_PASSTHROUGH = "passthrough"
+
+
+def _append_image(chain: MessageChain, url: str):
+    chain.image(url)
+
+
+def _append_passthrough(chain: MessageChain, comp: Comp.BaseMessageComponent):
+    chain.chain.append(comp)
+
+
+# 媒体类型标记 -> 追加到消息链的处理函数
+MEDIA_HANDLERS: Dict[str, Callable[[MessageChain, Any], None]] = {
+    MEDIA_IMAGE_URL: _append_image,
+    MEDIA_PASSTHROUGH: _append_passthrough,
+}
+
+
+def _render_fallback(values: Dict[str, str]) -> str:
+    """转发格式模板有误时使用的兜底格式"""
+    return f"[{values['pool_name']}] {values['sender_name']}: {values['message']}"
+
+
+def _emit_pool_lines(pools: list) -> Iterator[str]:
+    """逐行生成 interflow_list 指令输出的消息池信息"""
+    yield "[Interflow] 消息池列表:"
+    for i, pool in enumerate(pools, 1):
+        name = pool.get("name", "未命名")
+        status = "启用" if pool.get("enabled", True) else "停用"
+        groups = pool.get("groups", [])
+        fmt = pool.get("format", "") or "(使用默认格式)"
+        yield f"\n{i}. {name} [{status}]"
+        yield f"   群组数: {len(groups)}"
+        yield f"   格式: {fmt}"
+        for g in groups:
+            yield f"   - {g}"
+
+
+class Route:
+    """单个来源群组在某个消息池中的转发路由
+
+    在构建索引时为每个 (来源群组, 消息池) 生成，包含消息池名称、
+    预编译的转发格式渲染函数，以及该池负责的（已跨池去重的）转发目标。
+    """
+
+    __slots__ = ("pool_name", "template_fn", "targets")
+
+    def __init__(
+        self,
+        pool_name: str,
+        template_fn: Callable[[Dict[str, str]], str],
+        targets: Tuple[str, ...],
+    ):
+        self.pool_name = pool_name
+        self.template_fn = template_fn
+        self.targets = targets
+
+
+# 合并发送的默认参数：单批最多合并的消息数、等待后续消息的最长时间（秒）
+DEFAULT_BATCH_MAX_SIZE = 16
+DEFAULT_BATCH_MAX_WAIT = 0.05
+
+
+class CoalescingSender:
+    """单个目标群组的合并发送器
+
+    转发消息先进入队列，后台任务在 max_wait 时间窗口内最多收集 max_batch 条，
+    将其中连续的纯文本/图片消息合并为一条消息链发送，以减少平台 API 调用次数。
+    含文件、视频、语音的消息链在多数平台上无法与其他消息段合并，仍单独发送。
+    同一目标的消息按入队顺序依次发送。
+    """
+
+    def __init__(
+        self,
+        target_umo: str,
+        send: Callable[[str, MessageChain, str], Awaitable[None]],
+        max_batch: int,
+        max_wait: float,
+    ):
+        self.target_umo = target_umo
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._send = send
+        self._queue: "asyncio.Queue[Tuple[MessageChain, str]]" = asyncio.Queue()
+        # 已从队列取出、尚未发送完毕的消息数
+        self._in_flight = 0
+        self._task = asyncio.create_task(self._drain())
+
+    def submit(self, chain: MessageChain, pool_name: str):
+        """将一条待转发的消息链加入队列"""
+        self._queue.put_nowait((chain, pool_name))
+
+    @property
+    def alive(self) -> bool:
+        """后台发送任务是否仍在运行"""
+        return not self._task.done()
+
+    async def drain_and_close(self):
+        """等待已提交的消息全部发送完毕后再停止后台任务"""
+        try:
+            if self.alive:
+                await self._queue.join()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """立即停止后台发送任务，尚未发送的消息将被丢弃并记录日志"""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        dropped = self._queue.qsize() + self._in_flight
+        if dropped:
+            logger.warning(
+                "[Interflow] 合并发送器 %s 已停止，最多 %d 条待发送消息被丢弃",
+                self.target_umo,
+                dropped,
+            )
+
+    async def _drain(self):
+        """后台任务：按批次从队列取出消息，合并后依次发送"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            self._in_flight = 1
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                self._in_flight += 1
+
+            try:
+                for chain, pool_name in self._merge(batch):
+                    await self._send(self.target_umo, chain, pool_name)
+                self._in_flight = 0
+            except Exception:
+                # 单批发送出错不应终止后台任务，否则后续消息会在队列中无限堆积
+                logger.error(
+                    "[Interflow] 合并发送到 %s 时出错（本批 %d 条消息），未发送部分已丢弃",
+                    self.target_umo,
+                    len(batch),
+                    exc_info=True,
+                )
+                self._in_flight = 0
+            finally:
+                # 任务被取消时保留 _in_flight，供 close 统计丢弃数量
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _mergeable(chain: MessageChain) -> bool:
+        """消息链是否仅包含可与其他消息合并的纯文本和图片"""
+        return all(isinstance(seg, (Comp.Plain, Comp.Image)) for seg in chain.chain)
+
+    @classmethod
+    def _merge(
+        cls, batch: List[Tuple[MessageChain, str]]
+    ) -> List[Tuple[MessageChain, str]]:
+        """将同一消息池的连续可合并消息链拼接为一条，消息之间以换行分隔"""
+        merged: List[Tuple[MessageChain, str]] = []
+        open_chain: Optional[MessageChain] = None
+        open_pool: Optional[str] = None
+        for chain, pool_name in batch:
+            if not cls._mergeable(chain):
+                merged.append((chain, pool_name))
+                open_chain = None
+                continue
+            if open_chain is not None and pool_name == open_pool:
+                open_chain.message("\n")
+                open_chain.chain.extend(chain.chain)
+                continue
+            open_chain = chain
+            open_pool = pool_name
+            merged.append((chain, pool_name))
+        return merged
 
 
 @register(
@@ -35,158 +282,362 @@ class InterflowPlugin(Star):
         super().__init__(context)
         self.config = config
 
-        # unified_msg_origin -> 所属消息池列表 的快速查找索引
-        # 一个群组可以同时属于多个消息池
-        self._umo_to_pools: Dict[str, List[dict]] = {}
+        # unified_msg_origin -> 转发路由列表 的快速查找索引
+        # 一个群组可以同时属于多个消息池，转发目标在构建索引时预先计算并跨池去重
+        self._routes: Dict[str, List[Route]] = {}
+
+        # 模板字符串 -> 预编译渲染函数 的缓存，避免每条消息都重新解析模板
+        self._template_cache: Dict[str, Callable[[Dict[str, str]], str]] = {}
+
+        # 已启用转发的媒体消息段类型 -> 类型标记，随索引一同根据配置刷新
+        self._enabled_media_types: Dict[type, str] = {}
+
+        # 全局默认转发格式，随索引一同根据配置刷新
+        self._default_format: str = ""
+
+        # 合并发送配置，随索引一同根据配置刷新
+        self._enable_batching: bool = False
+        self._batch_max_size: int = DEFAULT_BATCH_MAX_SIZE
+        self._batch_max_wait: float = DEFAULT_BATCH_MAX_WAIT
+
+        # 目标 unified_msg_origin -> 合并发送器，首次向该目标转发时创建
+        self._senders: Dict[str, CoalescingSender] = {}
+        # 正在排空队列、等待停止的合并发送器任务
+        self._retiring_senders: Set[asyncio.Task] = set()
+
+        # 平台名称 -> 已见过的 Bot 自身 ID 集合，用于尽早跳过 Bot 自己发出的消息
+        self._known_bot_ids: Dict[str, FrozenSet[str]] = {}
+
+        # 上次构建索引时消息池及默认格式配置的签名，用于在配置未变化时跳过重建
+        self._last_pools_sig: Optional[int] = None
 
         # 构建索引
         self._build_index()
 
-    def _build_index(self):
-        """根据配置构建 unified_msg_origin -> 消息池 的快速查找索引"""
-        self._umo_to_pools.clear()
+    def _build_index(self) -> bool:
+        """根据配置构建 unified_msg_origin -> 消息池及转发目标 的快速查找索引
+
+        媒体类型、默认格式等全局配置每次都会刷新；
+        消息池及默认格式配置未变化时跳过索引重建。
+        返回是否重建了索引。
+        """
+        # 根据配置刷新需要转发的媒体类型
+        media_types: Dict[type, str] = {}
+        if self.config.get("forward_image", True):
+            media_types[Comp.Image] = MEDIA_IMAGE_URL
+        if self.config.get("forward_file", False):
+            media_types[Comp.File] = MEDIA_PASSTHROUGH
+        if self.config.get("forward_video", False):
+            media_types[Comp.Video] = MEDIA_PASSTHROUGH
+        if self.config.get("forward_voice", False):
+            media_types[Comp.Record] = MEDIA_PASSTHROUGH
+        self._enabled_media_types = media_types
+
+        self._default_format = self.config.get(
+            "default_format",
+            "[{platform} | {pool_name}] {sender_name}:\n{message}",
+        )
+
+        self._enable_batching = self.config.get("enable_batching", False)
+        self._batch_max_size = max(
+            1, int(self.config.get("batch_max_size", DEFAULT_BATCH_MAX_SIZE))
+        )
+        self._batch_max_wait = max(
+            0.0, float(self.config.get("batch_max_wait", DEFAULT_BATCH_MAX_WAIT))
+        )
+        if self._enable_batching:
+            # 已创建的合并发送器同步使用新配置
+            for sender in self._senders.values():
+                sender.max_batch = self._batch_max_size
+                sender.max_wait = self._batch_max_wait
+        else:
+            # 关闭合并发送后不再需要任何合并发送器
+            self._prune_senders(set())
 
         pools: list = self.config.get("pools", [])
+        # 路由中预编译了转发格式，默认格式变化时同样需要重建
+        pools_sig = hash(repr((pools, self._default_format)))
+        if pools_sig == self._last_pools_sig:
+            logger.info("[Interflow] 消息池配置无变化，跳过索引重建")
+            return False
+        self._last_pools_sig = pools_sig
+
+        self._routes.clear()
+        self._template_cache.clear()
+
+        # 先收集每个群组所属的消息池（按配置顺序），并为每个消息池解析一次转发格式
+        umo_to_pools: Dict[str, List[dict]] = {}
+        pool_templates: Dict[int, Tuple[str, Callable[[Dict[str, str]], str]]] = {}
         for pool in pools:
             # 跳过未启用的消息池
             if not pool.get("enabled", True):
                 continue
 
+            pool_templates[id(pool)] = self._resolve_pool_template(pool)
+
             groups: list = pool.get("groups", [])
             for umo in groups:
-                if umo not in self._umo_to_pools:
-                    self._umo_to_pools[umo] = []
-                self._umo_to_pools[umo].append(pool)
+                if umo not in umo_to_pools:
+                    umo_to_pools[umo] = []
+                umo_to_pools[umo].append(pool)
+
+        # 再为每个来源群组计算去重后的转发目标
+        # 例如：群A 同时在池1和池2中，群B也同时在池1和池2中，
+        # 群A发消息时，群B 只需要收到一次转发，且使用先出现的池1的格式
+        for umo, member_pools in umo_to_pools.items():
+            seen: Set[str] = {umo}
+            routes: List[Route] = []
+            for pool in member_pools:
+                targets: List[str] = []
+                for target_umo in pool.get("groups", []):
+                    if target_umo in seen:
+                        continue
+                    seen.add(target_umo)
+                    targets.append(target_umo)
+                if targets:
+                    pool_name, template_fn = pool_templates[id(pool)]
+                    routes.append(Route(pool_name, template_fn, tuple(targets)))
+            self._routes[umo] = routes
+
+        # 关闭已不在任何消息池中的目标的合并发送器
+        self._prune_senders(
+            {
+                target_umo
+                for routes in self._routes.values()
+                for route in routes
+                for target_umo in route.targets
+            }
+        )
 
         pool_count = len([p for p in pools if p.get("enabled", True)])
-        group_count = len(self._umo_to_pools)
+        group_count = len(self._routes)
         logger.info(
-            f"[Interflow] 索引构建完成: {pool_count} 个活跃消息池, {group_count} 个群组已注册"
+            "[Interflow] 索引构建完成: %d 个活跃消息池, %d 个群组已注册",
+            pool_count,
+            group_count,
         )
+        return True
+
+    def _resolve_pool_template(
+        self, pool: dict
+    ) -> Tuple[str, Callable[[Dict[str, str]], str]]:
+        """解析消息池名称并预编译其转发格式（为空则用默认格式）
 
-    def _format_message(
+        模板有误时记录一次警告，并使用兜底格式。
+        """
+        pool_name = pool.get("name", "未命名消息池")
+        pool_format = pool.get("format", "") or self._default_format
+        try:
+            template_fn = self._compile_template(pool_format)
+        except ValueError as e:
+            logger.warning(
+                "[Interflow] 消息池 '%s' 的转发格式模板有误: %s，使用原始消息",
+                pool_name,
+                e,
+            )
+            template_fn = _render_fallback
+        return pool_name, template_fn
+
+    @staticmethod
+    def _resolve_datetime(timestamp: Optional[int] = None) -> datetime.datetime:
+        """将消息时间戳转换为本地时间，时间戳无效时使用当前时间"""
+        if timestamp:
+            try:
+                return datetime.datetime.fromtimestamp(timestamp)
+            except (OSError, ValueError):
+                pass
+        return datetime.datetime.now()
+
+    def _compile_template(self, template: str) -> Callable[[Dict[str, str]], str]:
+        """将模板预解析为「字面量 + 变量名」片段列表，返回缓存的渲染函数
+
+        仅包含简单变量（如 {sender_name}）的模板走快速拼接路径；
+        带格式说明符、转换符或属性/下标访问的模板回退到 str.format，
+        以保持与原有行为及报错一致。
+        模板语法错误时抛出 ValueError，且不会写入缓存。
+        """
+        render = self._template_cache.get(template)
+        if render is not None:
+            return render
+
+        segments: List[Tuple[str, Optional[str]]] = []
+        simple = True
+        for literal, field_name, format_spec, conversion in Formatter().parse(template):
+            if field_name is not None and (
+                not field_name.isidentifier() or format_spec or conversion
+            ):
+                simple = False
+                break
+            segments.append((literal, field_name))
+
+        if simple:
+
+            def render(values: Dict[str, str]) -> str:
+                return "".join(
+                    literal + (str(values[field_name]) if field_name else "")
+                    for literal, field_name in segments
+                )
+
+        else:
+
+            def render(values: Dict[str, str]) -> str:
+                return template.format(**values)
+
+        self._template_cache[template] = render
+        return render
+
+    def _compute_base_values(
         self,
-        template: str,
         sender_name: str,
         sender_id: str,
         group_name: str,
-        pool_name: str,
         platform: str,
         message_text: str,
         timestamp: Optional[int] = None,
-    ) -> str:
-        """使用模板格式化转发消息的文本部分
+    ) -> Dict[str, str]:
+        """计算转发模板中与消息池无关的变量，每条消息只需计算一次
 
         支持的模板变量：
         - {sender_name}: 消息发送者昵称
         - {sender_id}: 消息发送者 ID
         - {group_name}: 源群组名称/标识
-        - {pool_name}: 消息池名称
+        - {pool_name}: 消息池名称（由调用方按消息池填入）
         - {platform}: 消息来源平台名称
         - {message}: 消息纯文本内容
         - {time}: 消息时间 (HH:MM:SS)
         - {date}: 消息日期 (YYYY-MM-DD)
         """
-        now = datetime.datetime.now()
-        if timestamp:
-            try:
-                now = datetime.datetime.fromtimestamp(timestamp)
-            except (OSError, ValueError):
-                pass
-
-        return template.format(
-            sender_name=sender_name,
-            sender_id=sender_id,
-            group_name=group_name,
-            pool_name=pool_name,
-            platform=platform,
-            message=message_text,
-            time=now.strftime("%H:%M:%S"),
-            date=now.strftime("%Y-%m-%d"),
-        )
-
-    def _extract_media_components(
-        self, message_chain: list
-    ) -> List[Comp.BaseMessageComponent]:
+        now = self._resolve_datetime(timestamp)
+        return {
+            "sender_name": sender_name,
+            "sender_id": sender_id,
+            "group_name": group_name,
+            "platform": platform,
+            "message": message_text,
+            "time": now.strftime("%H:%M:%S"),
+            "date": now.strftime("%Y-%m-%d"),
+        }
+
+    def _extract_media_components(self, message_chain: list) -> List[Tuple[str, Any]]:
         """从消息链中提取需要转发的媒体消息段（图片、文件、视频、语音）
 
-        根据配置决定是否包含各类媒体。
+        根据 _build_index 中按配置生成的媒体类型表决定是否包含各类媒体。
+        返回预解析的 (类型, 内容) 列表：
+        - (MEDIA_IMAGE_URL, 图片 URL 或文件路径)
+        - (MEDIA_PASSTHROUGH, 原始消息段)
+        无法解析出地址的图片会在此处直接丢弃。
         """
-        media = []
-        forward_image = self.config.get("forward_image", True)
-        forward_file = self.config.get("forward_file", False)
-        forward_video = self.config.get("forward_video", False)
-        forward_voice = self.config.get("forward_voice", False)
+        media: List[Tuple[str, Any]] = []
+        enabled_types = self._enabled_media_types
+        if not enabled_types:
+            return media
 
         for comp in message_chain:
-            if forward_image and isinstance(comp, Comp.Image):
-                media.append(comp)
-            elif forward_file and isinstance(comp, Comp.File):
-                media.append(comp)
-            elif forward_video and isinstance(comp, Comp.Video):
-                media.append(comp)
-            elif forward_voice and isinstance(comp, Comp.Record):
-                media.append(comp)
+            kind = enabled_types.get(type(comp))
+            if kind is None:
+                continue
+            if kind == MEDIA_IMAGE_URL:
+                # 优先使用 URL，其次使用文件路径
+                url = getattr(comp, "url", None) or getattr(comp, "file", None)
+                if url:
+                    media.append((MEDIA_IMAGE_URL, url))
+            else:
+                media.append((MEDIA_PASSTHROUGH, comp))
 
         return media
 
     def _build_chain(
-        self, formatted_text: str, media_components: List[Comp.BaseMessageComponent]
+        self, formatted_text: str, media_components: List[Tuple[str, Any]]
     ) -> MessageChain:
         """构建转发用的消息链：格式化文本 + 媒体附件"""
         chain = MessageChain()
         chain.message(formatted_text)
 
-        # 追加媒体消息段
-        for media_comp in media_components:
-            if isinstance(media_comp, Comp.Image):
-                # 优先使用 URL，其次使用文件路径
-                url = getattr(media_comp, "url", None) or getattr(
-                    media_comp, "file", None
-                )
-                if url:
-                    chain.image(url)
-            elif isinstance(media_comp, (Comp.File, Comp.Video, Comp.Record)):
-                # 文件、视频、语音直接追加到消息链
-                chain.chain.append(media_comp)
+        # 追加预解析的媒体消息段：图片按地址重新构建，文件、视频、语音直接追加
+        for kind, payload in media_components:
+            MEDIA_HANDLERS[kind](chain, payload)
 
         return chain
 
+    def _prune_senders(self, active_targets: Set[str]):
+        """移除不在 active_targets 中的目标的合并发送器
+
+        被移除的发送器不再接收新消息，会在后台发送完已排队的消息后停止。
+        """
+        for target_umo in list(self._senders):
+            if target_umo not in active_targets:
+                sender = self._senders.pop(target_umo)
+                task = asyncio.create_task(sender.drain_and_close())
+                self._retiring_senders.add(task)
+                task.add_done_callback(self._retiring_senders.discard)
+
+    def _get_sender(self, target_umo: str) -> CoalescingSender:
+        """获取（必要时创建）目标群组的合并发送器
+
+        已有发送器的后台任务意外结束时重新创建，避免消息堆积在失效的队列中。
+        """
+        sender = self._senders.get(target_umo)
+        if sender is None or not sender.alive:
+            sender = CoalescingSender(
+                target_umo,
+                self._send_with_retry,
+                self._batch_max_size,
+                self._batch_max_wait,
+            )
+            self._senders[target_umo] = sender
+        return sender
+
     async def _send_with_retry(
         self, target_umo: str, chain: MessageChain, pool_name: str
     ):
         """带重试机制的消息发送
 
-        使用指数退避策略，最多重试 MAX_RETRY 次。
-        针对 RuntimeError("Session is closed") 等瞬态错误进行重试。
+        使用带随机抖动的指数退避策略，最多尝试 MAX_RETRY 次，
+        最后一次尝试失败后不再等待。
+        针对 RuntimeError("Session is closed")、超时、连接错误等瞬态错误
+        （见 TRANSIENT_EXCS）进行重试，其余错误直接放弃。
         """
         last_exc = None
         for attempt in range(1, MAX_RETRY + 1):
             try:
                 await self.context.send_message(target_umo, chain)
                 return  # 发送成功，直接返回
-            except RuntimeError as e:
-                # 捕获 "Session is closed" 等运行时错误，这类错误通常是瞬态的
+            except Exception as e:
+                if not _is_transient(e):
+                    # 非瞬态错误（如目标不存在、权限不足等），不重试
+                    logger.warning(
+                        "[Interflow] [%s] 发送到 %s 失败 (不可重试): %s",
+                        pool_name,
+                        target_umo,
+                        e,
+                    )
+                    return
                 last_exc = e
                 if attempt < MAX_RETRY:
-                    delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
+                    delay = min(
+                        RETRY_MAX_DELAY,
+                        RETRY_BASE_DELAY
+                        * (2 ** (attempt - 1))
+                        * (1 + random.random() * RETRY_JITTER),
+                    )
                     logger.warning(
-                        f"[Interflow] [{pool_name}] 发送到 {target_umo} 失败 "
-                        f"(第{attempt}次, {e}), {delay:.1f}s 后重试..."
+                        "[Interflow] [%s] 发送到 %s 失败 (第%d次, %s), %.1fs 后重试...",
+                        pool_name,
+                        target_umo,
+                        attempt,
+                        e,
+                        delay,
                     )
                     await asyncio.sleep(delay)
-            except Exception as e:
-                # 非瞬态错误（如目标不存在、权限不足等），不重试
-                logger.warning(
-                    f"[Interflow] [{pool_name}] 发送到 {target_umo} 失败 (不可重试): "
-                    f"{e}"
-                )
-                return
 
         # 重试耗尽仍然失败
         logger.error(
-            f"[Interflow] [{pool_name}] 发送到 {target_umo} 在 {MAX_RETRY} 次重试后仍失败: "
-            f"{last_exc}"
+            "[Interflow] [%s] 发送到 %s 在 %d 次重试后仍失败: %s",
+            pool_name,
+            target_umo,
+            MAX_RETRY,
+            last_exc,
+            exc_info=last_exc,
         )
 
     @filter.event_message_type(filter.EventMessageType.GROUP_MESSAGE)
@@ -196,80 +647,86 @@ class InterflowPlugin(Star):
         # 获取当前消息来源的 unified_msg_origin
         source_umo = event.unified_msg_origin
 
-        # 检查该群组是否属于任何消息池
-        if source_umo not in self._umo_to_pools:
-            return  # 不属于任何消息池，跳过
+        # 检查该群组是否属于任何消息池，且存在需要转发的其他群组
+        routes = self._routes.get(source_umo)
+        if not routes:
+            return  # 不属于任何消息池或没有转发目标，跳过
 
-        # 防循环：跳过 Bot 自身发送的消息
+        # 防循环：跳过 Bot 自身（包括同平台下已知的其他 Bot 账号）发送的消息
         message_obj = event.message_obj
         sender_id = event.get_sender_id()
-        bot_self_id = message_obj.self_id if message_obj else None
-
-        if bot_self_id and sender_id == bot_self_id:
+        platform_name = event.get_platform_name()
+        known_bot_ids = self._known_bot_ids.get(platform_name, _EMPTY_IDS)
+        if sender_id in known_bot_ids:
             return  # Bot 自己发的消息，跳过以避免无限循环
 
+        bot_self_id = message_obj.self_id if message_obj else None
+        if bot_self_id:
+            if bot_self_id not in known_bot_ids:
+                self._known_bot_ids[platform_name] = known_bot_ids | {bot_self_id}
+            if sender_id == bot_self_id:
+                return
+
         # 获取消息的基本信息
         sender_name = event.get_sender_name()
         message_text = event.message_str
-        platform_name = event.get_platform_name()
         group_id = message_obj.group_id if message_obj else source_umo
         timestamp = message_obj.timestamp if message_obj else None
 
+        # 除消息池名称外，模板变量对所有消息池相同，只需计算一次
+        values = self._compute_base_values(
+            sender_name=sender_name,
+            sender_id=sender_id,
+            group_name=group_id,
+            platform=platform_name,
+            message_text=message_text,
+            timestamp=timestamp,
+        )
+
         # 获取原始消息链中的媒体消息段
         original_chain = event.get_messages()
         media_components = self._extract_media_components(original_chain)
 
-        # 默认转发格式
-        default_format = self.config.get(
-            "default_format",
-            "[{platform} | {pool_name}] {sender_name}:\n{message}",
-        )
-
-        # 记录已发送过的目标 UMO，避免同一条消息因多个消息池重复发送到同一目标
-        # 例如：群A 同时在池1和池2中，群B也同时在池1和池2中，
-        # 群A发消息时，群B 只需要收到一次转发即可
-        sent_targets: Set[str] = set()
+        # 待并发执行的发送任务，避免慢速目标拖累整体转发延迟
+        tasks: List[asyncio.Task] = []
 
-        # 遍历该群组所属的所有消息池
-        pools = self._umo_to_pools[source_umo]
-        for pool in pools:
-            pool_name = pool.get("name", "未命名消息池")
-            # 消息池自定义格式，为空则用默认格式
-            pool_format = pool.get("format", "") or default_format
+        # 遍历该群组所属的所有消息池（转发目标已在构建索引时去重）
+        for route in routes:
+            pool_name = route.pool_name
 
-            # 格式化转发文本
+            # 格式化转发文本（模板已在构建索引时预编译）
+            values["pool_name"] = pool_name
             try:
-                formatted_text = self._format_message(
-                    template=pool_format,
-                    sender_name=sender_name,
-                    sender_id=sender_id,
-                    group_name=group_id,
-                    pool_name=pool_name,
-                    platform=platform_name,
-                    message_text=message_text,
-                    timestamp=timestamp,
-                )
+                formatted_text = route.template_fn(values)
             except (KeyError, ValueError, IndexError) as e:
                 logger.warning(
-                    f"[Interflow] 消息池 '{pool_name}' 的转发格式模板有误: {e}，使用原始消息"
+                    "[Interflow] 消息池 '%s' 的转发格式模板有误: %s，使用原始消息",
+                    pool_name,
+                    e,
                 )
-                formatted_text = f"[{pool_name}] {sender_name}: {message_text}"
+                formatted_text = _render_fallback(values)
 
-            # 转发到该消息池内的所有其他群组
-            groups: list = pool.get("groups", [])
-            for target_umo in groups:
-                # 跳过消息来源群组自身
-                if target_umo == source_umo:
-                    continue
+            # 同一消息池内各目标的消息链内容相同，只需构建一次
+            chain = self._build_chain(formatted_text, media_components)
 
-                # 去重：如果此目标已在其他消息池中被转发过，则跳过
-                if target_umo in sent_targets:
+            # 转发到该消息池内的所有其他群组
+            for target_umo in route.targets:
+                # 各目标并发发送，浅拷贝消息链以防平台适配器或合并发送修改消息段列表
+                target_chain = copy.copy(chain)
+                target_chain.chain = list(chain.chain)
+                if self._enable_batching:
+                    # 交由目标的合并发送器排队发送，不阻塞当前事件
+                    self._get_sender(target_umo).submit(target_chain, pool_name)
                     continue
-                sent_targets.add(target_umo)
+                tasks.append(
+                    asyncio.create_task(
+                        self._send_with_retry(target_umo, target_chain, pool_name)
+                    )
+                )
 
-                # 构建消息链并发送（带重试）
-                chain = self._build_chain(formatted_text, media_components)
-                await self._send_with_retry(target_umo, chain, pool_name)
+        # 并发发送到所有目标，单个目标失败不影响其他目标
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
 
         # 停止事件继续传播，避免消息被 LLM 等后续流程处理
         event.stop_event()
@@ -278,11 +735,17 @@ class InterflowPlugin(Star):
     @filter.permission_type(filter.PermissionType.ADMIN)
     async def reload_config(self, event: AstrMessageEvent):
         """重新加载消息池配置索引（仅管理员可用）"""
-        self._build_index()
+        rebuilt = self._build_index()
         pool_count = len(
             [p for p in self.config.get("pools", []) if p.get("enabled", True)]
         )
-        group_count = len(self._umo_to_pools)
+        group_count = len(self._routes)
+        if not rebuilt:
+            yield event.plain_result(
+                f"[Interflow] 消息池配置无变化，其余配置已刷新: "
+                f"{pool_count} 个活跃消息池, {group_count} 个群组已注册"
+            )
+            return
         yield event.plain_result(
             f"[Interflow] 配置已重新加载: {pool_count} 个活跃消息池, {group_count} 个群组已注册"
         )
@@ -295,21 +758,7 @@ class InterflowPlugin(Star):
             yield event.plain_result("[Interflow] 当前没有配置任何消息池。")
             return
 
-        lines = ["[Interflow] 消息池列表:"]
-        for i, pool in enumerate(pools, 1):
-            name = pool.get("name", "未命名")
-            enabled = pool.get("enabled", True)
-            status = "启用" if enabled else "停用"
-            groups = pool.get("groups", [])
-            fmt = pool.get("format", "") or "(使用默认格式)"
-            lines.append(f"\n{i}. {name} [{status}]")
-            lines.append(f"   群组数: {len(groups)}")
-            lines.append(f"   格式: {fmt}")
-            if groups:
-                for g in groups:
-                    lines.append(f"   - {g}")
-
-        yield event.plain_result("\n".join(lines))
+        yield event.plain_result("\n".join(_emit_pool_lines(pools)))
 
     @filter.command("interflow_umo", alias={"ifumo"})
     async def show_umo(self, event: AstrMessageEvent):
@@ -322,5 +771,15 @@ class InterflowPlugin(Star):
 
     async def terminate(self):
         """插件卸载/停用时清理资源"""
-        self._umo_to_pools.clear()
+        self._routes.clear()
+        self._last_pools_sig = None
+        # 插件停用时不再等待排队消息，直接停止并记录丢弃数量
+        retiring = list(self._retiring_senders)
+        for task in retiring:
+            task.cancel()
+        await asyncio.gather(*retiring, return_exceptions=True)
+        for sender in self._senders.values():
+            await sender.close()
+        self._senders.clear()
+        self._known_bot_ids.clear()
         logger.info("[Interflow] 插件已停用，索引已清理。")